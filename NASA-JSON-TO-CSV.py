@@ -1,27 +1,248 @@
-import pandas as pd
-import requests
-import json
+import argparse
+import asyncio
+import csv
+import gzip
+import hashlib
+import math
+import os
+import queue
+import tempfile
+import threading
 import time
-from datetime import datetime
+import aiohttp
+import numpy as np
+import orjson
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+from urllib.parse import urlencode
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Callable, Tuple, IO
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow es opcional; sin él se usa el escritor CSV de pandas
+    pa = None
+
+# Ruta de claves de cada campo NEO conservado y su nombre de columna final
+_RUTAS_COLUMNAS = [
+    (("id",), "id_asteroide"),
+    (("name",), "nombre"),
+    (("absolute_magnitude_h",), "magnitud_absoluta"),
+    (("estimated_diameter", "kilometers", "estimated_diameter_min"), "diametro_min_km"),
+    (("estimated_diameter", "kilometers", "estimated_diameter_max"), "diametro_max_km"),
+    (("is_potentially_hazardous_asteroid",), "es_peligroso"),
+    (("orbital_data", "orbit_id"), "id_orbita"),
+    (("orbital_data", "semi_major_axis"), "semi_eje_mayor"),
+    (("orbital_data", "eccentricity"), "excentricidad"),
+]
+
+COLUMNAS_NUMERICAS = ['magnitud_absoluta', 'diametro_min_km', 'diametro_max_km',
+                      'semi_eje_mayor', 'excentricidad']
+
+COLUMNAS_CSV = [columna for _, columna in _RUTAS_COLUMNAS] + ['diametro_promedio_km']
+
+ESTADISTICAS = ['count', 'mean', 'std', 'min', 'max']
+
+# Límites de peticiones por hora de la API de NASA
+_PETICIONES_HORA_DEMO_KEY = 30
+_PETICIONES_HORA_CLAVE_PROPIA = 1000
+
+# Política de reintentos de las peticiones a la API
+_REINTENTOS = 3
+_FACTOR_RETROCESO = 0.5
+_ESTADOS_REINTENTABLES = (429, 500, 502, 503, 504)
+
+
+def _crear_extractor(ruta: Tuple[str, ...]) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Genera una función que lee una ruta de claves de un objeto NEO.
+
+    La ruta se compila como una única expresión de subíndices (p. ej. `o['a']['b']`),
+    evitando recorrer las claves en un bucle por cada valor extraído.
+
+    Args:
+        ruta: Claves anidadas hasta el valor
+
+    Returns:
+        Función que devuelve el valor o None si falta alguna clave
+    """
+    acceso = "".join(f"[{clave!r}]" for clave in ruta)
+    codigo = (
+        "def extractor(o):\n"
+        "    try:\n"
+        f"        return o{acceso}\n"
+        "    except (KeyError, TypeError):\n"
+        "        return None\n"
+    )
+    espacio = {}
+    exec(codigo, espacio)
+    return espacio['extractor']
+
+
+# Extractores precompilados, en el mismo orden que `_RUTAS_COLUMNAS`
+_EXTRACTORES = [_crear_extractor(ruta) for ruta, _ in _RUTAS_COLUMNAS]
+
+_INDICES_NUMERICOS = [COLUMNAS_CSV.index(columna) for columna in COLUMNAS_NUMERICAS]
+_INDICE_DIAMETRO_MIN = COLUMNAS_CSV.index('diametro_min_km')
+_INDICE_DIAMETRO_MAX = COLUMNAS_CSV.index('diametro_max_km')
+_INDICE_PELIGROSO = COLUMNAS_CSV.index('es_peligroso')
+
+
+def _segundos_retry_after(valor: Optional[str]) -> Optional[float]:
+    """
+    Interpreta la cabecera Retry-After, expresada en segundos o como fecha HTTP.
+
+    Returns:
+        Segundos a esperar o None si la cabecera falta o no es válida
+    """
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        fecha = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return max(0.0, (fecha - datetime.now(timezone.utc)).total_seconds())
+
+
+def _encolar(cola: queue.Queue, elemento: Any, detener: threading.Event) -> bool:
+    """
+    Encola un elemento esperando a que haya hueco, salvo que se active `detener`.
+
+    Returns:
+        True si se encoló, False si se abandonó porque el consumidor dejó de leer
+    """
+    while not detener.is_set():
+        try:
+            cola.put(elemento, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _a_numero(valor: Any) -> Optional[float]:
+    """Convierte un valor de la API a float, o None si no es numérico."""
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _extraer_fila(objeto: Dict[str, Any]) -> List[Any]:
+    """
+    Extrae de un objeto NEO los valores de las columnas de `COLUMNAS_CSV`.
+
+    Args:
+        objeto: Diccionario con los datos de un NEO
+
+    Returns:
+        Lista de valores en el orden de `COLUMNAS_CSV`
+    """
+    fila = [extractor(objeto) for extractor in _EXTRACTORES]
+    for indice in _INDICES_NUMERICOS:
+        fila[indice] = _a_numero(fila[indice])
+    # Los valores ausentes cuentan como no peligrosos, igual que en `procesar_datos`
+    fila[_INDICE_PELIGROSO] = bool(fila[_INDICE_PELIGROSO])
+
+    minimo, maximo = fila[_INDICE_DIAMETRO_MIN], fila[_INDICE_DIAMETRO_MAX]
+    fila.append((minimo + maximo) / 2 if minimo is not None and maximo is not None else None)
+    return fila
+
+
+def _abrir_csv(ruta: Path, comprimir: bool, binario: bool = False) -> IO:
+    """
+    Abre para escritura el archivo CSV de salida.
+
+    Con `comprimir` se usa gzip con nivel 1, que prioriza la velocidad sobre la tasa de compresión.
+    """
+    if binario:
+        return gzip.open(ruta, 'wb', compresslevel=1) if comprimir else open(ruta, 'wb')
+    if comprimir:
+        return gzip.open(ruta, 'wt', compresslevel=1, encoding='utf-8', newline='')
+    return open(ruta, 'w', encoding='utf-8', newline='')
+
+
+def _jdump(objeto: Any, opciones: int = 0) -> str:
+    """Serializa un objeto a texto JSON con orjson, admitiendo escalares y arreglos de NumPy."""
+    return orjson.dumps(objeto, option=opciones | orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+
+
+class _EstadisticaEnLinea:
+    """Acumula recuento, media, desviación estándar, mínimo y máximo en una sola pasada."""
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def agregar(self, valor: float) -> None:
+        """Incorpora un valor usando el algoritmo de Welford."""
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self._m2 += delta * (valor - self.media)
+        self.minimo = min(self.minimo, valor)
+        self.maximo = max(self.maximo, valor)
+
+    def resumen(self) -> Dict[str, float]:
+        """Devuelve las estadísticas acumuladas con los mismos nombres que `DataFrame.describe`."""
+        if not self.n:
+            return {nombre: (0 if nombre == 'count' else math.nan) for nombre in ESTADISTICAS}
+        return {
+            'count': self.n,
+            'mean': self.media,
+            'std': math.sqrt(self._m2 / (self.n - 1)) if self.n > 1 else math.nan,
+            'min': self.minimo,
+            'max': self.maximo,
+        }
 
 
 class RecopiladorDatosNASANeo:
     """Clase para recopilar y procesar datos de Objetos Cercanos a la Tierra (NEO) de la API de NASA."""
 
-    def __init__(self, clave_api: str = "DEMO_KEY", limite_peticiones: int = 1):
+    def __init__(self, clave_api: str = "DEMO_KEY", limite_peticiones: Optional[float] = None,
+                 paginas_concurrentes: int = 10, usar_cache: bool = True):
         """
         Inicializa el recopilador de datos NEO.
 
         Args:
             clave_api: Clave de la API de NASA (predeterminado: "DEMO_KEY")
-            limite_peticiones: Tiempo de espera entre llamadas a la API en segundos (predeterminado: 1)
+            limite_peticiones: Segundos que tarda en recuperarse cada petición del cubo de fichas
+                una vez agotada la cuota por hora (predeterminado: 3600 / cuota por hora, es decir
+                120 s con DEMO_KEY y 3,6 s con clave propia)
+            paginas_concurrentes: Número máximo de páginas en curso a la vez (predeterminado: 10)
+            usar_cache: Reutilizar respuestas guardadas en disco durante una semana (predeterminado: True)
         """
         self.url_api = "https://api.nasa.gov/neo/rest/v1/neo/browse"
         self.clave_api = clave_api
+        por_hora = _PETICIONES_HORA_DEMO_KEY if clave_api == "DEMO_KEY" else _PETICIONES_HORA_CLAVE_PROPIA
+        if limite_peticiones is None:
+            limite_peticiones = 3600 / por_hora
         self.limite_peticiones = limite_peticiones
+        self.paginas_concurrentes = paginas_concurrentes
+        self.usar_cache = usar_cache
+        self.directorio_cache = Path(".cache")
+        self.vigencia_cache = timedelta(days=7)
+        # Cubo de fichas compartido por todas las peticiones: admite una ráfaga de hasta la
+        # cuota por hora y recupera una ficha cada `limite_peticiones` segundos
+        self.capacidad_peticiones = por_hora
+        self._fichas = float(por_hora)
+        self._ultima_recarga = time.monotonic()
+        self._candado_fichas = threading.Lock()
+        # Páginas que no se pudieron obtener en el último recorrido de `iterar_paginas`
+        self.paginas_fallidas: List[int] = []
 
         # Configuración de registro
         self._configurar_registro()
@@ -42,55 +263,350 @@ class RecopiladorDatosNASANeo:
             ]
         )
 
+    def _ruta_cache(self, parametros: Dict[str, Any]) -> Path:
+        """Calcula el archivo de caché de una consulta a partir del endpoint y sus parámetros."""
+        # La clave de API no cambia la respuesta, así que no forma parte de la clave de caché
+        consulta = urlencode(sorted((k, v) for k, v in parametros.items() if k != 'api_key'))
+        clave = hashlib.sha1(f"{self.url_api}?{consulta}".encode('utf-8')).hexdigest()
+        return self.directorio_cache / f"{clave}.json"
+
+    def _leer_cache(self, parametros: Dict[str, Any],
+                    referencia: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Lee y decodifica una respuesta de la caché en disco.
+
+        Una entrada ilegible (p. ej. truncada) se elimina y se trata como ausente. Con
+        `referencia`, la entrada solo se acepta si procede de la misma versión del catálogo:
+        los NEO nuevos desplazan objetos entre páginas, así que mezclar páginas de días
+        distintos duplicaría u omitiría objetos.
+
+        Args:
+            parametros: Diccionario de parámetros de consulta
+            referencia: Metadatos `page` de la página 0 actual, con los que debe coincidir la entrada
+                en `total_elements` y `size`
+
+        Returns:
+            Datos guardados o None si la caché está desactivada, no existe, expiró, está dañada
+            o no coincide con `referencia`
+        """
+        if not self.usar_cache:
+            return None
+
+        ruta = self._ruta_cache(parametros)
+        try:
+            if datetime.now() - datetime.fromtimestamp(ruta.stat().st_mtime) > self.vigencia_cache:
+                return None
+            datos = orjson.loads(ruta.read_bytes())
+        except OSError:
+            return None
+        except orjson.JSONDecodeError:
+            logging.warning(f"Entrada de caché dañada, se descarta: {ruta}")
+            try:
+                ruta.unlink()
+            except OSError:
+                pass
+            return None
+
+        if referencia is not None:
+            pagina = datos.get('page') or {}
+            if any(pagina.get(campo) != referencia.get(campo) for campo in ('total_elements', 'size')):
+                return None
+        return datos
+
+    def _escribir_cache(self, parametros: Dict[str, Any], contenido: bytes) -> None:
+        """
+        Guarda el contenido de una respuesta en la caché en disco.
+
+        Se escribe primero en un archivo temporal que luego reemplaza a la entrada, de modo
+        que una escritura interrumpida nunca deja una entrada truncada.
+        """
+        if not self.usar_cache:
+            return
+
+        temporal = None
+        try:
+            self.directorio_cache.mkdir(exist_ok=True)
+            descriptor, temporal = tempfile.mkstemp(dir=self.directorio_cache, suffix='.tmp')
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(contenido)
+            os.replace(temporal, self._ruta_cache(parametros))
+        except OSError as e:
+            logging.warning(f"No se pudo guardar la respuesta en caché: {str(e)}")
+            if temporal is not None and os.path.exists(temporal):
+                os.remove(temporal)
+
+    def _reservar_ficha(self) -> float:
+        """
+        Toma una ficha del cubo y calcula cuánto hay que esperar para poder usarla.
+
+        Mientras queden fichas la espera es cero. Agotadas, el saldo pasa a negativo y
+        cada reserva espera a que se recupere su propia ficha, de modo que las peticiones
+        quedan espaciadas `limite_peticiones` segundos. El candado solo protege la reserva;
+        la espera se hace fuera de él.
+
+        Returns:
+            Segundos a esperar antes de lanzar la petición
+        """
+        with self._candado_fichas:
+            ahora = time.monotonic()
+            if self.limite_peticiones > 0:
+                self._fichas += (ahora - self._ultima_recarga) / self.limite_peticiones
+            else:
+                self._fichas = self.capacidad_peticiones
+            self._fichas = min(self._fichas, self.capacidad_peticiones) - 1
+            self._ultima_recarga = ahora
+            return max(0.0, -self._fichas * self.limite_peticiones)
+
+    def _ajustar_fichas(self, restantes: Optional[str]) -> None:
+        """Limita las fichas a las peticiones que la API indica que quedan (X-RateLimit-Remaining)."""
+        try:
+            restantes = int(restantes)
+        except (TypeError, ValueError):
+            return
+        with self._candado_fichas:
+            self._fichas = min(self._fichas, restantes)
+
+    async def _esperar_turno_async(self) -> None:
+        """Espera a disponer de una ficha del cubo antes de lanzar una petición."""
+        espera = self._reservar_ficha()
+        if espera > 0:
+            await asyncio.sleep(espera)
+
     def obtener_datos(self, parametros: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Obtiene datos de la API de NASA con manejo de errores y lógica de reintentos.
 
+        Envoltorio síncrono de `_obtener_datos_async` para consultas sueltas.
+
         Args:
             parametros: Diccionario de parámetros de consulta
 
         Returns:
             Datos de respuesta de la API o None si la petición falla
         """
-        max_intentos = 3
-        for intento in range(max_intentos):
+        datos = self._leer_cache(parametros)
+        if datos is not None:
+            return datos
+
+        async def obtener() -> Optional[Dict[str, Any]]:
+            async with aiohttp.ClientSession() as sesion:
+                return await self._obtener_datos_async(sesion, threading.Event(), asyncio.Event(), parametros)
+
+        return asyncio.run(obtener())
+
+    async def _obtener_datos_async(self, sesion: aiohttp.ClientSession, detener: threading.Event,
+                                   cuota_agotada: asyncio.Event,
+                                   parametros: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene una página de la API de forma asíncrona con lógica de reintentos.
+
+        Es la única implementación de la petición HTTP: la usan tanto la descarga de
+        páginas como `obtener_datos`. No lee la caché, pero guarda en ella la respuesta; la
+        lectura queda en manos de quien llama, que sabe si la entrada sigue siendo válida. Reintenta los errores de conexión y los estados de
+        `_ESTADOS_REINTENTABLES` con retroceso exponencial, respetando Retry-After.
+
+        Args:
+            sesion: Sesión HTTP compartida por las peticiones
+            detener: Evento que indica que ya no se necesitan más páginas
+            cuota_agotada: Evento que se activa cuando la API sigue respondiendo 429 tras los reintentos
+            parametros: Diccionario de parámetros de consulta
+
+        Returns:
+            Datos de respuesta de la API o None si la petición falla o se detuvo la descarga
+        """
+        pagina = parametros.get('page')
+        for intento in range(_REINTENTOS + 1):
+            if detener.is_set() or cuota_agotada.is_set():
+                return None
+            await self._esperar_turno_async()
+            if detener.is_set() or cuota_agotada.is_set():
+                return None
+            estado = None
+            retry_after = None
             try:
-                respuesta = requests.get(self.url_api, params=parametros, timeout=10)
-                respuesta.raise_for_status()
-                return respuesta.json()
-            except requests.exceptions.RequestException as e:
-                logging.error(f"Intento {intento + 1}/{max_intentos} falló: {str(e)}")
-                if intento < max_intentos - 1:
-                    time.sleep(2 ** intento)  # Retroceso exponencial
-                    continue
+                async with sesion.get(self.url_api, params=parametros,
+                                      timeout=aiohttp.ClientTimeout(total=10)) as respuesta:
+                    estado = respuesta.status
+                    self._ajustar_fichas(respuesta.headers.get('X-RateLimit-Remaining'))
+                    if estado in _ESTADOS_REINTENTABLES:
+                        retry_after = respuesta.headers.get('Retry-After')
+                    else:
+                        respuesta.raise_for_status()
+                        contenido = await respuesta.read()
+            except aiohttp.ClientResponseError as e:
+                # Estado de error no reintentable (p. ej. 403 por clave inválida)
+                logging.error(f"Página {pagina}: la petición falló: {str(e)}")
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = str(e)
+            else:
+                if estado not in _ESTADOS_REINTENTABLES:
+                    try:
+                        datos = orjson.loads(contenido)
+                    except orjson.JSONDecodeError as e:
+                        logging.error(f"Página {pagina}: respuesta no válida: {str(e)}")
+                        return None
+                    self._escribir_cache(parametros, contenido)
+                    return datos
+                error = f"estado HTTP {estado}"
+
+            if intento == _REINTENTOS:
+                logging.error(f"Página {pagina}: la petición falló tras los reintentos: {error}")
+                if estado == 429:
+                    # Seguir pidiendo páginas solo consumiría peticiones condenadas a fallar
+                    logging.error("Límite de peticiones de la API agotado; se detiene la descarga")
+                    cuota_agotada.set()
                 return None
 
-    def obtener_todos_datos(self) -> List[Dict[str, Any]]:
+            espera = _segundos_retry_after(retry_after)
+            if espera is None:
+                espera = _FACTOR_RETROCESO * 2 ** intento  # Retroceso exponencial
+            logging.warning(f"Página {pagina}: intento {intento + 1} falló ({error}), "
+                            f"reintentando en {espera:.1f} s")
+            await asyncio.sleep(espera)
+
+    async def _descargar_paginas(self, cola: queue.Queue, detener: threading.Event) -> None:
         """
-        Obtiene todos los datos paginados de NEO desde la API.
+        Descarga todas las páginas y las encola en orden como tuplas (página, datos).
 
-        Returns:
-            Lista de diccionarios con datos NEO
+        La página 0 se pide siempre a la API: indica el número total de páginas
+        (`page.total_pages`) y sirve de referencia para aceptar o descartar las demás
+        páginas guardadas en caché (ver `_leer_cache`). El resto se reparte entre
+        `paginas_concurrentes` trabajadores que toman el siguiente número de página en
+        cuanto terminan el anterior, así que una página lenta (p. ej. por reintentos)
+        no frena a las demás. Las páginas que llegan antes de tiempo esperan
+        en un búfer hasta poder entregarse en orden. Si la API agota la cuota de
+        peticiones (429 persistente) no se solicitan más páginas.
+
+        Args:
+            cola: Cola donde se depositan tuplas (página, datos)
+            detener: Evento activado por el consumidor cuando deja de leer páginas
+        """
+        cuota_agotada = asyncio.Event()
+        conector = aiohttp.TCPConnector(limit=self.paginas_concurrentes)
+        async with aiohttp.ClientSession(connector=conector) as sesion:
+            logging.info("Obteniendo página 0...")
+            primera = await self._obtener_datos_async(sesion, detener, cuota_agotada,
+                                                      {'api_key': self.clave_api, 'page': 0})
+            total_paginas = 1
+            referencia: Dict[str, Any] = {}
+            if primera and primera.get('near_earth_objects'):
+                referencia = primera.get('page') or {}
+                total_paginas = referencia.get('total_pages')
+                if not isinstance(total_paginas, int):
+                    raise ValueError("La respuesta de la API no incluye page.total_pages; "
+                                     "no se puede saber cuántas páginas descargar")
+            if not _encolar(cola, (0, primera), detener):
+                return
+
+            if total_paginas > 1:
+                logging.info(f"Obteniendo páginas 1 a {total_paginas - 1}...")
+            paginas = iter(range(1, total_paginas))
+            descargadas: Dict[int, Optional[Dict[str, Any]]] = {}
+            siguiente = 1
+
+            async def trabajador() -> None:
+                nonlocal siguiente
+                for pagina in paginas:
+                    if detener.is_set() or cuota_agotada.is_set():
+                        return
+                    parametros = {'api_key': self.clave_api, 'page': pagina}
+                    datos = self._leer_cache(parametros, referencia)
+                    if datos is None:
+                        datos = await self._obtener_datos_async(sesion, detener, cuota_agotada, parametros)
+                    descargadas[pagina] = datos
+                    # Entregar en orden las páginas consecutivas ya descargadas
+                    while siguiente in descargadas:
+                        if not _encolar(cola, (siguiente, descargadas.pop(siguiente)), detener):
+                            return
+                        siguiente += 1
+
+            await asyncio.gather(*(trabajador() for _ in range(self.paginas_concurrentes)))
+
+            # Si la descarga se cortó, entregar lo que quedó detrás de una página no solicitada
+            for pagina in sorted(descargadas):
+                if not _encolar(cola, (pagina, descargadas[pagina]), detener):
+                    return
+
+    def _producir_paginas(self, cola: queue.Queue, detener: threading.Event) -> None:
         """
-        todos_datos = []
-        pagina = 0
+        Ejecuta la descarga en un hilo de fondo.
 
-        while True:
-            parametros = {'api_key': self.clave_api, 'page': pagina}
-            logging.info(f"Obteniendo página {pagina}...")
+        Al terminar encola None; si la descarga falla, encola antes la excepción
+        para que el consumidor la relance. Si el consumidor activa `detener`, el hilo
+        termina sin encolar nada más.
+        """
+        try:
+            asyncio.run(self._descargar_paginas(cola, detener))
+        except Exception as e:
+            _encolar(cola, e, detener)
+        finally:
+            _encolar(cola, None, detener)
+
+    def iterar_paginas(self) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorre las páginas de NEO de la API, entregando cada una al llegar.
 
-            datos = self.obtener_datos(parametros)
-            if not datos or 'near_earth_objects' not in datos or not datos['near_earth_objects']:
-                break
+        Todas las páginas, incluida la primera, se descargan en un hilo de fondo, de
+        modo que las siguientes ya están en camino mientras se procesa la actual.
+        Al terminar, las páginas que no se pudieron obtener quedan en `paginas_fallidas`.
 
-            todos_datos.extend(datos['near_earth_objects'])
-            logging.info(f"Recuperados {len(datos['near_earth_objects'])} objetos de la página {pagina}")
+        Yields:
+            Lista de diccionarios con los datos NEO de una página
+        """
+        self.paginas_fallidas = []
+
+        # Hasta 2 × `paginas_concurrentes` páginas descargadas por delante del consumidor
+        cola = queue.Queue(maxsize=2 * self.paginas_concurrentes)
+        detener = threading.Event()
+        productor = threading.Thread(target=self._producir_paginas, args=(cola, detener), daemon=True)
+        productor.start()
+
+        total_objetos = 0
+        pendientes = {0}
+
+        # Si el consumidor deja de iterar (error o cierre anticipado), el productor se detiene
+        try:
+            while True:
+                elemento = cola.get()
+                if elemento is None:
+                    break
+                if isinstance(elemento, Exception):
+                    raise elemento
+
+                pagina, datos = elemento
+                if pagina == 0 and datos is not None and not datos.get('near_earth_objects'):
+                    # La API no devolvió ningún objeto; no falta ninguna página
+                    pendientes.clear()
+                    continue
+                if not datos or not datos.get('near_earth_objects'):
+                    logging.error(f"No se pudieron obtener datos de la página {pagina}")
+                    continue
 
-            pagina += 1
-            time.sleep(self.limite_peticiones)
+                if pagina == 0:
+                    # `_descargar_paginas` ya comprobó que la página 0 incluye el total
+                    pendientes.update(range(1, datos['page']['total_pages']))
+                pendientes.discard(pagina)
+                total_objetos += len(datos['near_earth_objects'])
+                logging.info(f"Recuperados {len(datos['near_earth_objects'])} objetos de la página {pagina}")
+                yield datos['near_earth_objects']
+        finally:
+            detener.set()
+            self.paginas_fallidas = sorted(pendientes)
+
+        if self.paginas_fallidas:
+            logging.error(f"Faltan {len(self.paginas_fallidas)} páginas")
+
+        logging.info(f"Total de objetos recuperados: {total_objetos}")
+
+    def obtener_todos_datos(self) -> List[Dict[str, Any]]:
+        """
+        Obtiene todos los datos paginados de NEO desde la API.
 
-        logging.info(f"Total de objetos recuperados: {len(todos_datos)}")
-        return todos_datos
+        Returns:
+            Lista de diccionarios con datos NEO
+        """
+        return [objeto for pagina in self.iterar_paginas() for objeto in pagina]
 
     def procesar_datos(self, datos: List[Dict[str, Any]]) -> pd.DataFrame:
         """
@@ -105,41 +621,55 @@ class RecopiladorDatosNASANeo:
         if not datos:
             raise ValueError("No hay datos para procesar")
 
-        df = pd.json_normalize(datos)
-
-        # Seleccionar y renombrar columnas
-        mapeo_columnas = {
-            "id": "id_asteroide",
-            "name": "nombre",
-            "absolute_magnitude_h": "magnitud_absoluta",
-            "estimated_diameter.kilometers.estimated_diameter_min": "diametro_min_km",
-            "estimated_diameter.kilometers.estimated_diameter_max": "diametro_max_km",
-            "is_potentially_hazardous_asteroid": "es_peligroso",
-            "orbital_data.orbit_id": "id_orbita",
-            "orbital_data.semi_major_axis": "semi_eje_mayor",
-            "orbital_data.eccentricity": "excentricidad"
+        # Extraer solo los campos necesarios en búferes preasignados; las columnas
+        # numéricas se convierten a float64 al vuelo
+        n = len(datos)
+        columnas = {
+            columna: np.empty(n, dtype=np.float64 if columna in COLUMNAS_NUMERICAS else object)
+            for _, columna in _RUTAS_COLUMNAS
         }
+        destinos = [
+            (extractor, columnas[columna], columna in COLUMNAS_NUMERICAS)
+            for extractor, (_, columna) in zip(_EXTRACTORES, _RUTAS_COLUMNAS)
+        ]
+        for i, objeto in enumerate(datos):
+            for extractor, destino, es_numerica in destinos:
+                valor = extractor(objeto)
+                if es_numerica:
+                    valor = _a_numero(valor)
+                    if valor is None:
+                        valor = np.nan
+                destino[i] = valor
+
+        # Los valores ausentes cuentan como no peligrosos
+        columnas['es_peligroso'] = columnas['es_peligroso'].astype(bool)
 
-        df = df[mapeo_columnas.keys()].rename(columns=mapeo_columnas)
+        # Agregar columnas derivadas
+        columnas['diametro_promedio_km'] = 0.5 * (columnas['diametro_min_km'] + columnas['diametro_max_km'])
 
-        # Convertir columnas numéricas
-        columnas_numericas = ['magnitud_absoluta', 'diametro_min_km', 'diametro_max_km',
-                              'semi_eje_mayor', 'excentricidad']
-        for col in columnas_numericas:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        df = pd.DataFrame(columnas, columns=COLUMNAS_CSV)
 
-        # Agregar columnas derivadas
-        df['diametro_promedio_km'] = (df['diametro_min_km'] + df['diametro_max_km']) / 2
+        if pa is not None:
+            # Columnas de texto y booleanas respaldadas por Arrow en lugar de objetos de Python
+            texto = pd.ArrowDtype(pa.string())
+            df = df.astype({'id_asteroide': texto, 'nombre': texto, 'id_orbita': texto,
+                            'es_peligroso': pd.ArrowDtype(pa.bool_())})
 
         return df
 
-    def guardar_datos(self, df: pd.DataFrame, directorio_salida: str = "datos") -> None:
+    def guardar_datos(self, df: pd.DataFrame, directorio_salida: str = "datos", comprimir: bool = True) -> None:
         """
         Guarda los datos procesados en CSV y genera un informe resumen.
 
+        Con pyarrow instalado el CSV se escribe con su escritor columnar. Los valores son
+        los mismos que con `DataFrame.to_csv` (booleanos como True/False, vacíos para nulos),
+        pero el texto y la cabecera van entre comillas y los números muy pequeños o muy
+        grandes pueden escribirse en notación decimal en lugar de exponencial.
+
         Args:
             df: DataFrame procesado
             directorio_salida: Directorio para guardar archivos de salida
+            comprimir: Comprimir el CSV con gzip (predeterminado: True)
         """
         # Crear directorio de salida
         ruta_salida = Path(directorio_salida)
@@ -147,8 +677,18 @@ class RecopiladorDatosNASANeo:
 
         # Guardar conjunto de datos principal
         marca_tiempo = datetime.now().strftime('%Y%m%d_%H%M%S')
-        ruta_csv = ruta_salida / f"nasa_neo_datos_{marca_tiempo}.csv"
-        df.to_csv(ruta_csv, index=False)
+        ruta_csv = ruta_salida / f"nasa_neo_datos_{marca_tiempo}.csv{'.gz' if comprimir else ''}"
+        if pa is not None:
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            # Escribir los booleanos como True/False, igual que pandas y csv.writer
+            indice = tabla.schema.get_field_index('es_peligroso')
+            tabla = tabla.set_column(indice, 'es_peligroso',
+                                     pa_compute.if_else(tabla['es_peligroso'], 'True', 'False'))
+            with _abrir_csv(ruta_csv, comprimir, binario=True) as f:
+                pa_csv.write_csv(tabla, f)
+        else:
+            df.to_csv(ruta_csv, index=False, lineterminator='\n',
+                      compression={'method': 'gzip', 'compresslevel': 1} if comprimir else None)
         logging.info(f"Datos guardados en {ruta_csv}")
 
         # Generar y guardar informe resumen
@@ -157,38 +697,113 @@ class RecopiladorDatosNASANeo:
             f.write("Resumen de Datos NEO de NASA\n")
             f.write("=" * 50 + "\n\n")
 
+            peligrosos = int(np.count_nonzero(df['es_peligroso'].to_numpy(dtype=bool, na_value=False)))
             f.write(f"Total de objetos: {len(df)}\n")
-            f.write(f"Objetos peligrosos: {df['es_peligroso'].sum()}\n\n")
+            f.write(f"Objetos peligrosos: {peligrosos}\n\n")
 
             f.write("Resumen Estadístico:\n")
-            f.write(df.describe().to_string())
+            f.write(_jdump(df.select_dtypes('number').describe().to_dict(), orjson.OPT_INDENT_2))
 
         logging.info(f"Informe resumen guardado en {ruta_informe}")
 
+    def guardar_datos_incremental(self, paginas: Iterable[List[Dict[str, Any]]], directorio_salida: str = "datos",
+                                  comprimir: bool = True) -> Optional[Dict[str, Dict[str, float]]]:
+        """
+        Escribe en CSV cada página a medida que llega y genera un informe resumen.
+
+        A diferencia de `guardar_datos`, no mantiene todos los objetos en memoria ni
+        construye un DataFrame: las estadísticas se calculan en la misma pasada.
+
+        Args:
+            paginas: Iterable de páginas con datos NEO, p. ej. `iterar_paginas()`
+            directorio_salida: Directorio para guardar archivos de salida
+            comprimir: Comprimir el CSV con gzip (predeterminado: True)
+
+        Returns:
+            Resumen estadístico de las columnas numéricas o None si no hubo datos
+        """
+        ruta_salida = Path(directorio_salida)
+        ruta_salida.mkdir(exist_ok=True)
+
+        marca_tiempo = datetime.now().strftime('%Y%m%d_%H%M%S')
+        ruta_csv = ruta_salida / f"nasa_neo_datos_{marca_tiempo}.csv{'.gz' if comprimir else ''}"
+
+        total = 0
+        peligrosos = 0
+        estadisticas = {
+            COLUMNAS_CSV.index(columna): _EstadisticaEnLinea()
+            for columna in COLUMNAS_NUMERICAS + ['diametro_promedio_km']
+        }
+        with _abrir_csv(ruta_csv, comprimir) as f:
+            escritor = csv.writer(f, lineterminator='\n')
+            escritor.writerow(COLUMNAS_CSV)
+            for pagina in paginas:
+                filas = [_extraer_fila(objeto) for objeto in pagina]
+                escritor.writerows(filas)
+                total += len(filas)
+                for fila in filas:
+                    if fila[_INDICE_PELIGROSO]:
+                        peligrosos += 1
+                    for indice, estadistica in estadisticas.items():
+                        if fila[indice] is not None:
+                            estadistica.agregar(fila[indice])
+
+        if not total:
+            ruta_csv.unlink()
+            return None
+        logging.info(f"Datos guardados en {ruta_csv}")
+
+        resumen = {COLUMNAS_CSV[indice]: estadistica.resumen() for indice, estadistica in estadisticas.items()}
+
+        ruta_informe = ruta_salida / f"nasa_neo_resumen_{marca_tiempo}.txt"
+        with open(ruta_informe, 'w', encoding='utf-8') as f:
+            f.write("Resumen de Datos NEO de NASA\n")
+            f.write("=" * 50 + "\n\n")
+
+            f.write(f"Total de objetos: {total}\n")
+            f.write(f"Objetos peligrosos: {peligrosos}\n")
+            if self.paginas_fallidas:
+                f.write(f"Páginas sin datos ({len(self.paginas_fallidas)}): {_jdump(self.paginas_fallidas)}\n")
+            f.write("\n")
+
+            f.write("Resumen Estadístico:\n")
+            f.write(_jdump(resumen, orjson.OPT_INDENT_2))
+
+        logging.info(f"Informe resumen guardado en {ruta_informe}")
+        return resumen
+
 
 def main():
     """Función principal de ejecución."""
     try:
-        # Inicializar recopilador
-        recopilador = RecopiladorDatosNASANeo()
+        parser = argparse.ArgumentParser(description="Recopila datos NEO de la API de NASA en CSV.")
+        parser.add_argument('--no-cache', action='store_true',
+                            help="Ignora la caché en disco y vuelve a descargar todas las páginas")
+        parser.add_argument('--no-gzip', action='store_true',
+                            help="Escribe el CSV sin comprimir")
+        parser.add_argument('--clave-api', default=os.environ.get('NASA_API_KEY', 'DEMO_KEY'),
+                            help="Clave de la API de NASA (predeterminado: variable NASA_API_KEY o DEMO_KEY)")
+        argumentos = parser.parse_args()
 
-        # Obtener datos
-        datos_crudos = recopilador.obtener_todos_datos()
-
-        if datos_crudos:
-            # Procesar datos
-            df = recopilador.procesar_datos(datos_crudos)
+        # Inicializar recopilador
+        recopilador = RecopiladorDatosNASANeo(clave_api=argumentos.clave_api, usar_cache=not argumentos.no_cache)
 
-            # Guardar resultados
-            recopilador.guardar_datos(df)
+        # Obtener, procesar y guardar los datos página a página
+        resumen = recopilador.guardar_datos_incremental(recopilador.iterar_paginas(),
+                                                        comprimir=not argumentos.no_gzip)
 
+        if resumen is not None:
             # Mostrar estadísticas básicas
             print("\nResumen de Datos:")
             print("-" * 50)
-            print(df.describe())
+            print(_jdump(resumen, orjson.OPT_INDENT_2))
         else:
             logging.error("No se recuperaron datos de la API")
 
+        if recopilador.paginas_fallidas:
+            raise RuntimeError(f"Descarga incompleta: no se pudieron obtener "
+                               f"{len(recopilador.paginas_fallidas)} páginas")
+
     except Exception as e:
         logging.error(f"Ocurrió un error: {str(e)}")
         raise